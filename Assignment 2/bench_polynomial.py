@@ -0,0 +1,347 @@
+"""Benchmarks for gpt_polynomial.Polynomial.
+
+Times construction, +, *, sorting (__lt__), str() and normalization while
+sweeping degree, density and coefficient size, for every backend:
+
+  dict    the original dict-based Polynomial, baseline_polynomial (reference)
+  auto    gpt_polynomial.Polynomial with its default layout choice
+  sparse  Polynomial kept in the sparse term-list layout
+  dense   Polynomial kept in the dense coefficient-array layout
+
+    python bench_polynomial.py --json results.json --plot-dir plots
+    python bench_polynomial.py --save-baseline baseline.json
+    python bench_polynomial.py --baseline baseline.json --threshold 1.5
+
+With --baseline the run exits with status 1 when any case got slower than
+threshold times its stored time. Plots need matplotlib.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+import baseline_polynomial
+from gpt_polynomial import Polynomial
+
+OPS = ("construct", "add", "mul", "sort", "str", "normalize")
+SORT_COUNT = 16  # polynomials per sort case
+
+
+# ---------- backends ----------
+class SparsePolynomial(Polynomial):
+    DENSE_MIN_TERMS = float("inf")
+
+
+class DensePolynomial(Polynomial):
+    DENSE_MIN_TERMS = 1
+    DENSE_FILL_RATIO = 0
+    SPARSE_FILL_RATIO = 0
+
+
+def _normalize_dict(p, raw: Dict[int, int]):
+    # what the baseline's operators do to every fresh result
+    p.poly_dict = dict(raw)
+    p.rmv_empty()
+
+
+def _normalize_gpt(p, raw: Dict[int, int]):
+    p.poly_dict = dict(raw)  # the setter normalizes
+
+
+def available_backends() -> Dict[str, Tuple[type, Callable]]:
+    backends = {"dict": (baseline_polynomial.Polynomial, _normalize_dict)}
+    backends["auto"] = (Polynomial, _normalize_gpt)
+    backends["sparse"] = (SparsePolynomial, _normalize_gpt)
+    backends["dense"] = (DensePolynomial, _normalize_gpt)
+    return backends
+
+
+# ---------- inputs ----------
+def random_terms(rng: random.Random, degree: int, density: float, bits: int) -> List[Tuple[int, int]]:
+    """(coefficient, exponent) pairs with the x^degree term always present."""
+    bound = 1 << bits
+
+    def coef():
+        return rng.choice((-1, 1)) * rng.randint(1, bound)
+
+    terms = [(coef(), e) for e in range(degree) if rng.random() < density]
+    terms.append((coef(), degree))
+    rng.shuffle(terms)
+    return terms
+
+
+def make_case(degree: int, density: float, bits: int, seed: int = 0):
+    rng = random.Random(hash((degree, density, bits, seed)))
+    a = random_terms(rng, degree, density, bits)
+    b = random_terms(rng, degree, density, bits)
+    # polynomials equal except for their lowest term, so every comparison
+    # walks all the terms
+    low = min(e for _, e in a)
+    shared = [(c, e) for c, e in a if e != low]
+    family = [shared + [(i + 1, low)] for i in range(SORT_COUNT)]
+    rng.shuffle(family)
+    raw = {e: c for c, e in a}
+    for e in rng.sample(range(degree + 1), min(degree + 1, max(1, len(raw) // 4))):
+        raw.setdefault(e, 0)  # zero entries left behind by an in-place edit
+    return a, b, family, raw
+
+
+def operations(cls, normalize: Callable, case) -> Dict[str, Callable]:
+    a_terms, b_terms, family_terms, raw = case
+    a, b = cls(a_terms), cls(b_terms)
+    family = [cls(t) for t in family_terms]
+    scratch = cls(a_terms)
+    return {
+        "construct": lambda: cls(a_terms),
+        "add": lambda: a + b,
+        "mul": lambda: a * b,
+        "sort": lambda: sorted(family),
+        "str": lambda: str(a),
+        "normalize": lambda: normalize(scratch, raw),
+    }
+
+
+def check_backends(backends, degree: int = 40, density: float = 0.5, bits: int = 70):
+    """Raise AssertionError unless every backend agrees with the first one.
+
+    Results are compared as exponent -> coefficient dicts, str() output as is.
+    """
+    case = make_case(degree, density, bits)
+    outputs = {}
+    for name, (cls, normalize) in backends.items():
+        ops = operations(cls, normalize, case)
+        scratch = cls(case[0])
+        normalize(scratch, case[3])
+        outputs[name] = [
+            dict(ops["construct"]().poly_dict),
+            dict(ops["add"]().poly_dict),
+            dict(ops["mul"]().poly_dict),
+            [dict(p.poly_dict) for p in ops["sort"]()],
+            ops["str"](),
+            dict(scratch.poly_dict),
+        ]
+    ref_name, ref = next(iter(outputs.items()))
+    for name, out in outputs.items():
+        for op, got, want in zip(OPS, out, ref):
+            assert got == want, f"{name} disagrees with {ref_name} on {op}"
+
+
+# ---------- timing ----------
+def best_time(fn: Callable, min_time: float = 0.02, repeat: int = 3) -> float:
+    """Best per-call time over `repeat` rounds of at least min_time seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_suite(
+    degrees=(10, 100, 1000, 10000),
+    densities=(1.0, 0.1, 0.01),
+    bits=(8, 64, 256),
+    ops=OPS,
+    backends=None,
+    max_seconds: float = 0.5,
+    min_time: float = 0.02,
+    repeat: int = 3,
+    log=None,
+) -> List[dict]:
+    """Time every (backend, op, degree, density, bits) case.
+
+    Degrees are run in increasing order; once a backend needs more than
+    max_seconds for an op, the larger degrees of that curve are skipped
+    (recorded with seconds None) instead of waiting on a quadratic
+    reference implementation.
+    """
+    if backends is None:
+        backends = available_backends()
+    records = []
+    too_slow = set()
+    for density in densities:
+        for b in bits:
+            for degree in sorted(degrees):
+                case = make_case(degree, density, b)
+                for name, (cls, normalize) in backends.items():
+                    table = operations(cls, normalize, case)
+                    for op in ops:
+                        curve = (name, op, density, b)
+                        seconds = None
+                        if curve not in too_slow:
+                            seconds = best_time(table[op], min_time, repeat)
+                            if seconds > max_seconds:
+                                too_slow.add(curve)
+                        case_id = {"backend": name, "op": op, "degree": degree, "density": density, "bits": b}
+                        records.append(dict(case_id, seconds=seconds))
+                        if log is not None:
+                            log(_format_record(records[-1]))
+    _add_speedups(records)
+    return records
+
+
+def _case_key(r: dict) -> Tuple:
+    return (r["backend"], r["op"], r["degree"], r["density"], r["bits"])
+
+
+def _add_speedups(records: List[dict]):
+    # speedup_vs_dict: reference time / backend time for the same case
+    ref = {_case_key(r)[1:]: r["seconds"] for r in records if r["backend"] == "dict"}
+    for r in records:
+        t, base = r["seconds"], ref.get(_case_key(r)[1:])
+        r["speedup_vs_dict"] = base / t if t and base else None
+
+
+def _format_record(r: dict) -> str:
+    t = "skipped" if r["seconds"] is None else f"{r['seconds'] * 1e6:12.1f} us"
+    return f"{r['backend']:>6} {r['op']:>9} degree={r['degree']:<6} density={r['density']:<5} bits={r['bits']:<4} {t}"
+
+
+# ---------- baselines ----------
+def compare_to_baseline(records: List[dict], baseline: List[dict], threshold: float = 1.5, floor: float = 5e-5):
+    """Cases slower than threshold * baseline (and by more than floor seconds).
+
+    Returns (record, baseline seconds) pairs; cases missing from either run
+    or skipped in either run are not compared.
+    """
+    old = {_case_key(r): r["seconds"] for r in baseline}
+    regressions = []
+    for r in records:
+        before = old.get(_case_key(r))
+        if r["seconds"] is None or before is None:
+            continue
+        if r["seconds"] > threshold * before and r["seconds"] - before > floor:
+            regressions.append((r, before))
+    return regressions
+
+
+def write_results(path, records: List[dict]):
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    Path(path).write_text(json.dumps({"meta": meta, "results": records}, indent=1), encoding="utf-8")
+
+
+def read_results(path) -> List[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["results"]
+
+
+# ---------- plots ----------
+def plot_scaling(records: List[dict], directory) -> List[Path]:
+    """One log-log time-vs-degree figure per op, a panel per coefficient size."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for op in sorted({r["op"] for r in records}):
+        rows = [r for r in records if r["op"] == op and r["seconds"] is not None]
+        bits = sorted({r["bits"] for r in rows})
+        if not bits:
+            continue
+        fig, axes = plt.subplots(1, len(bits), figsize=(5 * len(bits), 4), squeeze=False)
+        for ax, b in zip(axes[0], bits):
+            for name in dict.fromkeys(r["backend"] for r in rows):
+                for density in sorted({r["density"] for r in rows}, reverse=True):
+                    pts = sorted(
+                        (r["degree"], r["seconds"])
+                        for r in rows
+                        if r["backend"] == name and r["density"] == density and r["bits"] == b
+                    )
+                    if pts:
+                        ax.loglog(*zip(*pts), marker="o", label=f"{name}, density {density}")
+            ax.set_title(f"{op}, {b}-bit coefficients")
+            ax.set_xlabel("degree")
+            ax.set_ylabel("seconds")
+        axes[0][-1].legend(fontsize="small")
+        fig.tight_layout()
+        out = directory / f"{op}.png"
+        fig.savefig(out)
+        plt.close(fig)
+        written.append(out)
+    return written
+
+
+# ---------- command line ----------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--degrees", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--densities", type=float, nargs="+", default=[1.0, 0.1, 0.01])
+    parser.add_argument("--bits", type=int, nargs="+", default=[8, 64, 256])
+    parser.add_argument("--ops", nargs="+", choices=OPS, default=list(OPS))
+    parser.add_argument("--backends", nargs="+", help="subset of: dict auto sparse dense")
+    parser.add_argument("--max-seconds", type=float, default=0.5, help="skip larger degrees past this time")
+    parser.add_argument("--min-time", type=float, default=0.02, help="minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--plot-dir", help="write scaling plots (PNG) to this directory")
+    parser.add_argument("--baseline", help="compare against results stored by --save-baseline")
+    parser.add_argument("--save-baseline", help="store this run as a baseline")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown factor vs the baseline")
+    parser.add_argument("--floor", type=float, default=5e-5, help="ignore slowdowns below this many seconds")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    backends = available_backends()
+    if args.backends:
+        unknown = set(args.backends) - set(backends)
+        if unknown:
+            parser.error(f"unavailable backends: {', '.join(sorted(unknown))}")
+        backends = {name: backends[name] for name in args.backends}
+    check_backends(backends)
+
+    records = run_suite(
+        args.degrees,
+        args.densities,
+        args.bits,
+        args.ops,
+        backends,
+        max_seconds=args.max_seconds,
+        min_time=args.min_time,
+        repeat=args.repeat,
+        log=None if args.quiet else print,
+    )
+    if args.json:
+        write_results(args.json, records)
+    if args.save_baseline:
+        write_results(args.save_baseline, records)
+    if args.plot_dir:
+        try:
+            for path in plot_scaling(records, args.plot_dir):
+                print(f"wrote {path}")
+        except ImportError:
+            print("matplotlib is not installed; skipping plots", file=sys.stderr)
+    if args.baseline:
+        regressions = compare_to_baseline(records, read_results(args.baseline), args.threshold, args.floor)
+        for r, before in regressions:
+            print(f"REGRESSION {_format_record(r)} (baseline {before * 1e6:.1f} us)", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
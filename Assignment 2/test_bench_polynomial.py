@@ -0,0 +1,56 @@
+import json
+
+import baseline_polynomial
+import bench_polynomial as bench
+
+
+def tiny_suite(**kwargs):
+    return bench.run_suite(degrees=(5, 30), densities=(1.0, 0.2), bits=(8, 70), min_time=1e-4, repeat=1, **kwargs)
+
+
+def test_backends_agree():
+    backends = bench.available_backends()
+    assert {"dict", "auto", "sparse", "dense"} <= set(backends)
+    assert backends["dict"][0] is baseline_polynomial.Polynomial
+    bench.check_backends(backends)
+    bench.check_backends(backends, degree=200, density=0.05, bits=8)
+
+
+def test_suite_covers_every_case():
+    records = tiny_suite()
+    backends = bench.available_backends()
+    assert len(records) == len(backends) * len(bench.OPS) * 2 * 2 * 2
+    assert all(r["seconds"] > 0 for r in records)
+    assert all(r["speedup_vs_dict"] > 0 for r in records)
+    skipped = tiny_suite(ops=("mul",), max_seconds=0)
+    assert [r["seconds"] is None for r in skipped if r["backend"] == "dict"] == [False, True] * 4
+
+
+def test_baseline_comparison_flags_regressions():
+    base = [
+        {"backend": "auto", "op": "add", "degree": 10, "density": 1.0, "bits": 8, "seconds": 1e-3},
+        {"backend": "auto", "op": "mul", "degree": 10, "density": 1.0, "bits": 8, "seconds": 1e-3},
+        {"backend": "auto", "op": "str", "degree": 10, "density": 1.0, "bits": 8, "seconds": 1e-6},
+    ]
+    now = [dict(r) for r in base]
+    now[0]["seconds"] = 1.2e-3  # within the threshold
+    now[1]["seconds"] = 2e-3
+    now[2]["seconds"] = 3e-6  # 3x slower, but below the noise floor
+    assert bench.compare_to_baseline(now, base, threshold=1.5) == [(now[1], 1e-3)]
+    now[1]["seconds"] = None
+    assert bench.compare_to_baseline(now, base) == []
+
+
+def test_main_writes_results_and_fails_on_regression(tmp_path):
+    args = ["--degrees", "5", "--densities", "1", "--bits", "8", "--quiet"]
+    args += ["--min-time", "1e-4", "--repeat", "1", "--floor", "0"]
+    baseline = tmp_path / "baseline.json"
+    assert bench.main(args + ["--backends", "auto", "dict", "--save-baseline", str(baseline)]) == 0
+    stored = json.loads(baseline.read_text())
+    assert {r["backend"] for r in stored["results"]} == {"auto", "dict"}
+    for r in stored["results"]:
+        r["seconds"] /= 1000
+    baseline.write_text(json.dumps(stored))
+    out = tmp_path / "run.json"
+    assert bench.main(args + ["--backends", "auto", "--baseline", str(baseline), "--json", str(out)]) == 1
+    assert len(bench.read_results(out)) == len(bench.OPS)
@@ -0,0 +1,1442 @@
+import io
+import operator
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from gpt_polynomial import (
+    LazyPolynomial,
+    ModPolynomial,
+    MultiPolynomial,
+    Polynomial,
+    PolynomialArchive,
+    PolynomialArray,
+    PolynomialProfiler,
+)
+
+
+def dict_reference(poly_list):
+    """Plain dict of exponent -> coefficient with zero terms removed."""
+    d = {}
+    for c, e in poly_list:
+        d[e] = d.get(e, 0) + c
+    return {e: c for e, c in d.items() if c != 0}
+
+
+def random_poly_list(rng, degree, density=1.0, bound=10**6):
+    return [(rng.randint(-bound, bound), e) for e in range(degree + 1) if rng.random() < density]
+
+
+# ---------- Dense / sparse storage ----------
+
+def test_dense_layout_is_chosen_by_fill_ratio():
+    rng = random.Random(1)
+    dense = Polynomial(random_poly_list(rng, 500))
+    sparse = Polynomial([(1, 10**6), (2, 3), (5, 0)])
+    assert dense.is_dense()
+    assert not sparse.is_dense()
+
+
+def test_dense_keeps_public_behaviour():
+    rng = random.Random(2)
+    terms = random_poly_list(rng, 300, density=0.9)
+    p = Polynomial(terms)
+    assert p.is_dense()
+    assert p.poly_dict == dict_reference(terms)
+    assert p.key_list == sorted(p.poly_dict, reverse=True)
+    assert all(type(c) is int for c in p.poly_dict.values())
+    assert str(p) == str(Polynomial(terms[:10]) + Polynomial(terms[10:]))
+
+
+def test_poly_dict_edits_reach_dense_terms():
+    d = Polynomial([(1, e) for e in range(40)])
+    assert d.is_dense()
+    d.poly_dict[3] = 100
+    del d.poly_dict[39]
+    expected = Polynomial([(1, e) for e in range(39) if e != 3] + [(100, 3)])
+    assert d * Polynomial([(1, 0)]) == expected and d == expected
+    d.poly_dict[10**6] = 2**80  # outside the array, too big for int64
+    assert str(d + Polynomial()).startswith("1208925819614629174706176x^1000000 + 1x^38")
+    m = ModPolynomial([(1, e) for e in range(40)], 7)
+    m.poly_dict.update({0: 9, 1: 14})
+    assert m.poly_dict[0] == 2 and (m + ModPolynomial([], 7)).poly_dict.get(1) is None
+
+
+def test_poly_dict_edits_reach_sparse_terms():
+    p = Polynomial([(1, 2)])
+    p.poly_dict[5] = 3
+    assert str(p + Polynomial([(1, 0)])) == "3x^5 + 1x^2 + 1"
+    assert p == Polynomial([(1, 2), (3, 5)]) and p.key_list == [5, 2]
+    terms = p.poly_dict
+    terms[2] = 0
+    terms.pop(5)
+    terms[-1] = 4
+    assert p * Polynomial([(1, 1)]) == Polynomial([(4, 0)])
+    p += Polynomial([(1, 7)])
+    terms[3] = 1  # a stale view: detached, p keeps its terms
+    assert p == Polynomial([(4, -1), (1, 7)])
+
+
+@pytest.mark.parametrize("degree", [3, 60])
+def test_stale_poly_dict_handles_and_key_list_assignment(degree):
+    p = Polynomial([(1, e) for e in range(degree + 1)])
+    d = p.poly_dict
+    p += Polynomial([(10, 0)])
+    d[1] = 99  # p changed since d was handed out: d is detached
+    assert p.poly_dict[0] == 11 and p.poly_dict[1] == 1 and d[0] == 1
+    u = {1: 0, 2: 3}
+    p.poly_dict = u
+    assert u == {1: 0, 2: 3} and p.poly_dict == {2: 3}
+    p.poly_dict[5] = 4
+    p.poly_dict[1] = 0
+    p.key_list = sorted(p.poly_dict, reverse=True)
+    assert p.key_list == [5, 2] and str(p) == "4x^5 + 3x^2"
+    with pytest.raises(TypeError):
+        p.freeze().key_list = [5]
+
+
+def test_dense_arithmetic_matches_dict_arithmetic():
+    rng = random.Random(3)
+    a_terms = random_poly_list(rng, 200)
+    b_terms = random_poly_list(rng, 150, density=0.7)
+    a, b = Polynomial(a_terms), Polynomial(b_terms)
+    ra, rb = dict_reference(a_terms), dict_reference(b_terms)
+    s = dict(ra)
+    for e, c in rb.items():
+        s[e] = s.get(e, 0) + c
+    prod = {}
+    for e1, c1 in ra.items():
+        for e2, c2 in rb.items():
+            prod[e1 + e2] = prod.get(e1 + e2, 0) + c1 * c2
+    assert (a + b).poly_dict == {e: c for e, c in s.items() if c != 0}
+    assert (a - a).iszero()
+    assert (a * b).poly_dict == {e: c for e, c in prod.items() if c != 0}
+    assert (-a).poly_dict == {e: -c for e, c in ra.items()}
+
+
+def test_dense_switches_back_to_sparse():
+    p = Polynomial.from_coefficients(range(1, 101))
+    q = Polynomial([(-c, e) for e, c in enumerate(range(1, 100))])
+    r = p + q
+    assert r.poly_dict == {99: 100}
+    assert not r.is_dense()
+
+
+def test_dense_and_sparse_compare_equal():
+    p = Polynomial.from_coefficients([3] * 64)
+    q = Polynomial()
+    q.DENSE_MIN_TERMS = 10**9
+    q.poly_dict = {e: 3 for e in range(64)}
+    q._normalize()
+    assert p.is_dense() and not q.is_dense()
+    assert p == q and not p < q and not q < p
+
+
+def test_dense_overflow_promotes_to_big_ints():
+    big = 2**62
+    p = Polynomial.from_coefficients([big] * 40)
+    s = p + p
+    assert s.poly_dict[0] == 2**63
+    sq = p * p
+    assert sq.poly_dict[39] == 40 * big * big
+
+
+def test_add_chain_stays_int64_until_it_overflows():
+    rng = random.Random(20)
+    coeffs = [rng.randint(-(2**59), 2**59) for _ in range(60)]
+    p = Polynomial.from_coefficients(coeffs)
+    s, exact = p, list(coeffs)
+    for k in range(1, 40):
+        s = s + p
+        exact = [c + d for c, d in zip(exact, coeffs)]
+        assert s.coefficients().tolist() == exact
+        fits = max(map(abs, exact)) <= 2**63 - 1
+        assert (s.coefficients().dtype == np.int64) == fits
+
+
+def test_loose_bounds_are_rechecked_before_promoting():
+    big = Polynomial.from_coefficients([2**61 + i for i in range(50)])
+    near = Polynomial.from_coefficients([2**61] * 50)
+    small = big - near  # bound estimate 2**62, actual coefficients < 50
+    s = small
+    for _ in range(8):
+        s = s + small
+    assert s.coefficients().dtype == np.int64
+    assert s.coefficients().tolist() == [9 * i for i in range(50)]
+    s -= big
+    s += near + near
+    assert s.coefficients().dtype == np.int64
+    assert s.coefficients().tolist() == [2**61 + 8 * i for i in range(50)]
+
+
+def test_coefficients_round_trip():
+    coeffs = np.arange(-50, 50)
+    p = Polynomial.from_coefficients(coeffs)
+    assert np.array_equal(p.coefficients(), coeffs)
+    with pytest.raises(ValueError):
+        Polynomial([(1, -1)]).coefficients()
+
+
+# ---------- Multiplication engine ----------
+
+@pytest.mark.parametrize("bits", [8, 40, 200])
+@pytest.mark.parametrize("algorithm", ["schoolbook", "karatsuba", "ntt"])
+def test_mul_kernels_match_sparse_product(algorithm, bits):
+    rng = random.Random(bits)
+    a = Polynomial(random_poly_list(rng, 300, bound=2**bits))
+    b = Polynomial(random_poly_list(rng, 170, density=0.8, bound=2**bits))
+    expected = a.mul(b, algorithm="sparse")
+    assert a.mul(b, algorithm=algorithm).poly_dict == expected.poly_dict
+    assert a * b == expected
+
+
+def test_mul_thresholds_are_tunable():
+    rng = random.Random(5)
+    a = Polynomial(random_poly_list(rng, 100, bound=2**70))
+    expected = a.mul(a, algorithm="sparse")
+
+    class Tuned(Polynomial):
+        KARATSUBA_THRESHOLD = 4
+        NTT_THRESHOLD = 10**9
+
+    t = Tuned.from_coefficients(a.coefficients())
+    assert t * t == expected
+
+
+def test_mul_karatsuba_on_fractions():
+    from fractions import Fraction
+
+    a = Polynomial.from_coefficients([Fraction(i, i + 1) for i in range(100)])
+    assert a.mul(a, algorithm="karatsuba") == a.mul(a, algorithm="sparse")
+    with pytest.raises(ValueError):
+        a.mul(a, algorithm="ntt")
+
+
+def test_mul_large_degree_is_exact():
+    rng = np.random.default_rng(6)
+    a = Polynomial.from_coefficients(rng.integers(-1000, 1000, 50001))
+    b = Polynomial.from_coefficients(rng.integers(-1000, 1000, 50001))
+    prod = a * b
+    ca, cb = a.coefficients().tolist(), b.coefficients().tolist()
+    for k in (0, 1, 777, 50000, 99999, 100000):
+        lo, hi = max(0, k - 50000), min(k, 50000)
+        assert prod.poly_dict.get(k, 0) == sum(ca[i] * cb[k - i] for i in range(lo, hi + 1))
+
+
+
+def sparse_product_reference(a, b):
+    d = {}
+    for e1, c1 in a.poly_dict.items():
+        for e2, c2 in b.poly_dict.items():
+            d[e1 + e2] = d.get(e1 + e2, 0) + c1 * c2
+    return {e: c for e, c in d.items() if c != 0}
+
+
+@pytest.mark.parametrize("top", [10**4, 10**9, 2**63])
+@pytest.mark.parametrize("bound", [9, 2**70])
+def test_sparse_mul_merges_in_exponent_order(monkeypatch, top, bound):
+    import gpt_polynomial
+
+    rng = random.Random(top % 1000 + bound % 97)
+    a = Polynomial([(rng.randint(-bound, bound), rng.randint(-top, top)) for _ in range(150)])
+    b = Polynomial([(rng.randint(-bound, bound), rng.randint(0, top)) for _ in range(120)])
+
+    def no_sort(*args, **kwargs):
+        raise AssertionError("sparse products must come out ordered")
+
+    monkeypatch.setattr(gpt_polynomial, "sorted", no_sort, raising=False)
+    prod = a.mul(b, algorithm="sparse")
+    monkeypatch.undo()
+    assert prod.poly_dict == sparse_product_reference(a, b)
+    assert prod.key_list == sorted(prod.poly_dict, reverse=True)
+
+
+def test_sparse_mul_windows_match_heap_merge():
+    import gpt_polynomial
+
+    rng = random.Random(71)
+    a = Polynomial([(Fraction(rng.randint(-3, 3), rng.randint(1, 3)), rng.randint(0, 300)) for _ in range(60)])
+    b = Polynomial([(rng.randint(-3, 3), rng.randint(0, 10**6)) for _ in range(60)])
+    terms = (*a._term_lists(), *b._term_lists())
+    expected = gpt_polynomial._heap_product(*terms)
+    assert expected[0] == sorted(sparse_product_reference(a, b), reverse=True)
+    for window in (1, 7, 1000):
+        assert gpt_polynomial._window_product(*terms, window) == expected
+
+# ---------- Evaluation ----------
+
+def test_evaluate_scalar_is_exact():
+    from fractions import Fraction
+
+    p = Polynomial([(3, 4), (-17, 2), (-3, 1), (5, 0)])
+    assert p(2) == 3 * 16 - 17 * 4 - 6 + 5
+    assert p.evaluate(Fraction(1, 2)) == Fraction(3, 16) - Fraction(17, 4) - Fraction(3, 2) + 5
+    assert p(np.int64(10**5)) == 3 * 10**20 - 17 * 10**10 - 3 * 10**5 + 5
+    assert Polynomial()(7) == 0
+
+
+def test_evaluate_sparse_jumps_match_direct_sum():
+    p = Polynomial([(2, 1000), (-1, 7), (4, 0)])
+    assert p(3) == 2 * 3**1000 - 3**7 + 4
+
+
+def test_evaluate_array_float_and_integer_paths():
+    rng = random.Random(7)
+    terms = random_poly_list(rng, 60, bound=100)
+    p = Polynomial(terms)
+    xs = np.arange(-5, 6)
+    exact = p(xs)
+    assert exact.tolist() == [p(int(v)) for v in xs]
+    floats = p(xs, dtype=np.float64)
+    assert floats.dtype == np.float64
+    assert np.allclose(floats, [float(v) for v in exact], rtol=1e-12)
+    grid = np.linspace(-1, 1, 1001)
+    assert np.allclose(p(grid), [sum(c * v**e for c, e in terms) for v in grid])
+
+
+def test_evaluate_integer_array_promotes_to_big_ints():
+    p = Polynomial([(1, 40), (1, 0)])
+    vals = p(np.array([2, 10]))
+    assert vals.tolist() == [2**40 + 1, 10**40 + 1]
+    small = p(np.array([0, 1, -1]))
+    assert small.dtype == np.int64 and small.tolist() == [1, 2, 2]
+
+
+# ---------- Ordered term storage ----------
+
+def test_sparse_add_merges_without_sorting(monkeypatch):
+    import gpt_polynomial
+
+    rng = random.Random(8)
+    a_terms = [(rng.randint(-5, 5), rng.randrange(0, 10**6)) for _ in range(400)]
+    b_terms = [(rng.randint(-5, 5), rng.randrange(0, 10**6)) for _ in range(50)] + [(-c, e) for c, e in a_terms[:30]]
+    a, b = Polynomial(a_terms), Polynomial(b_terms)
+
+    def no_sort(*args, **kwargs):
+        raise AssertionError("addition must not re-sort its terms")
+
+    monkeypatch.setattr(gpt_polynomial, "sorted", no_sort, raising=False)
+    s, d = a + b, a - b
+    monkeypatch.undo()
+    assert s.poly_dict == dict_reference(a_terms + b_terms)
+    assert d.poly_dict == dict_reference(a_terms + [(-c, e) for c, e in b_terms])
+    assert s.key_list == sorted(s.poly_dict, reverse=True)
+    assert 0 not in s.poly_dict.values()
+
+
+def test_accumulation_keeps_terms_ordered():
+    total = Polynomial()
+    for k in range(200):
+        total = total + Polynomial([(k + 1, 3 * k), (-1, 7 * k)])
+    assert total.key_list == sorted(total.poly_dict, reverse=True)
+    assert total.poly_dict == dict_reference([(k + 1, 3 * k) for k in range(200)] + [(-1, 7 * k) for k in range(200)])
+
+
+def test_poly_dict_edit_then_normalize():
+    p = Polynomial([(1, 5), (2, 1)])
+    p.poly_dict[3] = 4
+    p.poly_dict[1] = 0
+    p._normalize()
+    assert p.key_list == [5, 3]
+    assert str(p) == "1x^5 + 4x^3"
+    q = Polynomial()
+    q.poly_dict = {2: 1, 0: -1, 1: 0}
+    assert str(q) == "1x^2 - 1"
+
+
+# ---------- In-place arithmetic and accumulation ----------
+
+def test_inplace_ops_keep_identity_and_match_binary_ops():
+    rng = random.Random(9)
+    for density in (1.0, 0.05):
+        a_terms = random_poly_list(rng, 400, density=density)
+        b_terms = random_poly_list(rng, 300, density=density)
+        for op, iop in (("__add__", "__iadd__"), ("__sub__", "__isub__"), ("__mul__", "__imul__")):
+            p, q = Polynomial(a_terms), Polynomial(b_terms)
+            expected = getattr(p, op)(q)
+            before = id(p)
+            p = getattr(p, iop)(q)
+            assert id(p) == before
+            assert p == expected
+            assert p.poly_dict == expected.poly_dict
+
+
+def test_inplace_add_short_into_long_sparse():
+    p = Polynomial([(1, 10 * k) for k in range(500)])
+    p += Polynomial([(-1, 100), (5, 105), (2, 0)])
+    p -= Polynomial([(1, 4990)])
+    assert p.key_list == sorted(p.poly_dict, reverse=True)
+    assert 100 not in p.poly_dict and 4990 not in p.poly_dict
+    assert p.poly_dict[105] == 5 and p.poly_dict[0] == 3
+
+
+def test_inplace_add_self_and_overflow():
+    p = Polynomial.from_coefficients([2**62] * 50)
+    p += p
+    assert p.poly_dict[10] == 2**63
+    p -= p
+    assert p.iszero()
+    for bad in (5, None, "x"):
+        q = Polynomial([(1, 1)])
+        for op in ("__iadd__", "__isub__", "__imul__"):
+            assert getattr(q, op)(bad) is NotImplemented
+        with pytest.raises(TypeError):
+            q += bad
+        with pytest.raises(TypeError):
+            q *= bad
+
+
+def test_sum_and_accumulator():
+    from gpt_polynomial import PolynomialAccumulator
+
+    rng = random.Random(10)
+    polys = [Polynomial(random_poly_list(rng, 80)) for _ in range(20)]
+    polys += [Polynomial([(1, -3), (rng.randint(1, 9), 10**9)]) for _ in range(20)]
+    polys.append(Polynomial.from_coefficients([2**62] * 5))
+    expected = Polynomial()
+    for p in polys:
+        expected = expected + p
+    assert Polynomial.sum(polys) == expected
+    assert Polynomial.sum([]).iszero()
+    acc = PolynomialAccumulator()
+    for p in polys:
+        acc += p
+    acc -= polys[0]
+    assert acc.result() == expected - polys[0]
+
+
+# ---------- Powers ----------
+
+def repeated_product(p, n):
+    out = Polynomial([(1, 0)])
+    for _ in range(n):
+        out = out * p
+    return out
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 16, 45])
+def test_pow_matches_repeated_multiplication(n):
+    for terms in ([(3, 4)], [(2, 5), (-3, 1)], [(1, 3), (-2, 1), (5, 0)], [(1, 1), (1, 0), (1, -2)]):
+        p = Polynomial(terms)
+        assert p**n == repeated_product(p, n)
+
+
+def test_pow_binomial_closed_form():
+    from math import comb
+
+    p = Polynomial([(1, 1), (1, 0)]) ** 300
+    assert p.poly_dict == {k: comb(300, k) for k in range(301)}
+    q = Polynomial([(-2, 10), (3, 4)]) ** 5
+    assert q.poly_dict == {4 * 5 + 6 * k: comb(5, k) * (-2) ** k * 3 ** (5 - k) for k in range(6)}
+
+
+def test_pow_negative_and_zero_cases():
+    from fractions import Fraction
+
+    assert (Polynomial([(2, 3)]) ** -2).poly_dict == {-6: Fraction(1, 4)}
+    assert (Polynomial() ** 0).poly_dict == {0: 1}
+    assert (Polynomial() ** 4).iszero()
+    with pytest.raises(ValueError):
+        Polynomial([(1, 1), (1, 0)]) ** -1
+
+
+def test_pow_cache_reuses_and_invalidates(monkeypatch):
+    p = Polynomial([(1, 2), (-1, 1), (3, 0)]).cache_powers(maxsize=3)
+    first = p**10
+    calls = []
+    real_mul = Polynomial.mul
+    monkeypatch.setattr(Polynomial, "mul", lambda a, b, algorithm="auto": calls.append(1) or real_mul(a, b, algorithm))
+    again = p**10
+    assert again == first and again is not first and not calls
+    p**11
+    assert len(calls) == 1  # p**10 * p
+    for k in (12, 13, 14):
+        p**k
+    assert list(p._pow_cache) == [12, 13, 14]
+    monkeypatch.undo()
+    p += Polynomial([(1, 0)])
+    assert not p._pow_cache
+    assert p**2 == Polynomial([(1, 2), (-1, 1), (4, 0)]) ** 2
+
+
+# ---------- Division and gcd ----------
+
+def check_divmod(a, b):
+    q, r = divmod(a, b)
+    assert q * b + r == a
+    assert r.iszero() or max(r.poly_dict) < max(b.poly_dict)
+    assert a // b == q and a % b == r
+    return q, r
+
+
+@pytest.mark.parametrize("newton", [10**9, 4])
+def test_divmod_dense_long_and_newton(newton):
+    rng = random.Random(11)
+
+    class Tuned(Polynomial):
+        NEWTON_THRESHOLD = newton
+
+    for lead in (1, -1, 3):
+        a = Tuned(random_poly_list(rng, 200, bound=50))
+        b = Tuned(random_poly_list(rng, 60, bound=50)[:-1] + [(lead, 61)])
+        q, r = check_divmod(a, b)
+        if lead in (1, -1):
+            assert all(type(c) is int for c in q.poly_dict.values())
+
+
+def test_divmod_sparse_and_binomial_divisors():
+    from fractions import Fraction
+
+    rng = random.Random(12)
+    a = Polynomial(random_poly_list(rng, 300, bound=20))
+    check_divmod(a, Polynomial([(1, 100), (-1, 0)]))
+    check_divmod(a, Polynomial([(2, 7), (5, 0)]))
+    check_divmod(a, Polynomial([(1, 50), (-3, 20), (1, 3), (7, 0)]))
+    q, r = check_divmod(Polynomial([(1, 2), (1, 0)]), Polynomial([(2, 1)]))
+    assert q.poly_dict == {1: Fraction(1, 2)} and r.poly_dict == {0: 1}
+
+
+def test_mod_reduces_huge_exponents_directly():
+    p = Polynomial([(1, 10**12 + 3), (2, 10**9), (-1, 7)])
+    assert (p % Polynomial([(1, 5), (-1, 0)])).poly_dict == {3: 1, 0: 2, 2: -1}
+    assert (p % Polynomial([(1, 5), (1, 0)])).poly_dict == {3: 1, 0: 2, 2: 1}
+
+
+def test_division_errors():
+    with pytest.raises(ZeroDivisionError):
+        divmod(Polynomial([(1, 1)]), Polynomial())
+    with pytest.raises(ValueError):
+        divmod(Polynomial([(1, -1)]), Polynomial([(1, 1)]))
+
+
+def test_gcd_integer_and_rational():
+    from fractions import Fraction
+
+    rng = random.Random(13)
+    f = Polynomial(random_poly_list(rng, 30, bound=10**6))
+    g = Polynomial(random_poly_list(rng, 25, bound=10**6))
+    h = Polynomial(random_poly_list(rng, 20, bound=10**6))
+    common = f.gcd(f)
+    assert common.poly_dict[max(common.poly_dict)] > 0
+    assert (f * g).gcd(f * h) == common * g.gcd(h)
+    assert Polynomial([(6, 1), (6, 0)]).gcd(Polynomial([(-4, 2), (4, 0)])) == Polynomial([(2, 1), (2, 0)])
+    half = Polynomial([(Fraction(1, 2), 2), (Fraction(-1, 2), 0)])
+    assert half.gcd(Polynomial([(3, 1), (3, 0)])) == Polynomial([(1, 1), (1, 0)])
+    assert Polynomial().gcd(Polynomial([(-2, 1)])) == Polynomial([(2, 1)])
+
+
+# ---------- Product trees ----------
+
+def fold_product(factors):
+    out = factors[0]
+    for f in factors[1:]:
+        out = out * f
+    return out
+
+
+def test_product_matches_left_fold():
+    rng = random.Random(51)
+    linear = [Polynomial([(1, 1), (-rng.randint(-10**6, 10**6), 0)]) for _ in range(300)]
+    assert Polynomial.product(linear) == fold_product(linear)
+    blocks = [Polynomial(random_poly_list(rng, 40, bound=9)) for _ in range(20)]
+    assert Polynomial.product(iter(blocks)) == fold_product(blocks)
+    mixed = [Polynomial([(1, 10**9), (3, 2)]), Polynomial([(2, 1), (-1, 0)]), Polynomial([(5, 0)])]
+    assert Polynomial.product(mixed) == fold_product(mixed)
+    assert Polynomial.product([]).poly_dict == {0: 1}
+    assert Polynomial.product(linear[:5] + [Polynomial()]).iszero()
+    for workers in (0, -2):
+        with pytest.raises(ValueError):
+            Polynomial.product(linear, workers=workers)
+
+
+def test_product_in_process_pool(monkeypatch):
+    m = 998244353
+    rng = random.Random(52)
+    monkeypatch.setattr(Polynomial, "PARALLEL_MIN_FACTORS", 8)
+    factors = [ModPolynomial([(1, 1), (-rng.randrange(m), 0)], m) for _ in range(200)]
+    prod = Polynomial.product(factors, workers=2)
+    assert isinstance(prod, ModPolynomial) and prod == Polynomial.product(factors)
+    small = [Polynomial([(1, 1), (rng.randint(-1, 1), 0)]) for _ in range(30)]
+    assert Polynomial.product(small, workers=2) == fold_product(small)
+    sparse = [Polynomial([(1, 10**6 * k), (1, 0)]) for k in range(1, 12)]
+    assert Polynomial.product(sparse, workers=3) == fold_product(sparse)
+
+
+# ---------- Frozen polynomials and memoization ----------
+
+def test_frozen_polynomials_hash_by_value():
+    rng = random.Random(41)
+    terms = random_poly_list(rng, 100)
+    dense = Polynomial(terms).freeze()
+    sparse = Polynomial()
+    sparse.DENSE_MIN_TERMS = 10**9
+    sparse.poly_dict = dense.poly_dict.copy()
+    sparse.freeze()
+    assert dense.is_dense() and not sparse.is_dense()
+    assert hash(dense) == hash(sparse) and len({dense, sparse}) == 1
+    assert {dense: "x"}[sparse] == "x"
+    with pytest.raises(TypeError):
+        hash(Polynomial(terms))
+    m = ModPolynomial([(8, 1)], 5).freeze()
+    assert hash(m) == hash(ModPolynomial([(3, 1)], 5).freeze())
+
+
+def test_frozen_polynomials_reject_mutation():
+    p = Polynomial([(1, 2), (3, 0)]).freeze()
+    q = p
+    q += Polynomial([(1, 0)])
+    q *= Polynomial([(2, 0)])
+    assert p.poly_dict == {2: 1, 0: 3} and q.poly_dict == {2: 2, 0: 8}
+    assert not q.is_frozen()
+    with pytest.raises(TypeError):
+        p.poly_dict[2] = 5
+    with pytest.raises(TypeError):
+        p.poly_dict = {1: 1}
+    d = Polynomial(random_poly_list(random.Random(42), 100)).freeze()
+    with pytest.raises(ValueError):
+        d._dense[0] = 1
+    with pytest.raises(TypeError):
+        p.key_list.append(7)
+    with pytest.raises(TypeError):
+        d.key_list[0] = 7
+    assert p.key_list == [2, 0] and p._copy().key_list.append(7) is None
+
+
+def test_frozen_operations_share_storage():
+    rng = random.Random(44)
+    sparse = Polynomial([(3, 900), (-2, 5), (1, 0)]).freeze()
+    dense = Polynomial(random_poly_list(rng, 100)).freeze()
+    zero, one = Polynomial().freeze(), Polynomial([(1, 0)]).freeze()
+    neg = -sparse
+    assert neg.is_frozen() and neg._keys is sparse._keys and -neg is sparse
+    assert neg.poly_dict == {900: -3, 5: 2, 0: -1}
+    for p in (sparse, dense):
+        assert p + zero is p and p - zero is p and zero + p is p and zero - p is -p
+        assert p * one is p and one * p is p and p ** 1 is p and p.truncate(10**6) is p
+    head = dense.truncate(40)
+    assert head.is_frozen() and np.shares_memory(head._dense, dense._dense)
+    assert head == Polynomial([(c, e) for e, c in dense.poly_dict.items() if e < 40])
+    mutable = Polynomial([(1, 0)])
+    assert sparse * mutable is not sparse and not (sparse * mutable).is_frozen()
+    shifted = dense.truncate(30) + Polynomial([(1, 1)]).freeze()
+    results = [sparse + dense, sparse * dense, dense ** 2, dense.derivative(), dense.compose(one + one)]
+    results += [*divmod(dense, shifted), dense.mul_trunc(sparse, 50), ModPolynomial([(1, 3)], 7).freeze() + sparse]
+    assert all(r.is_frozen() for r in results)
+    acc = dense
+    acc += sparse
+    assert acc.is_frozen() and not (dense + mutable).is_frozen() and not (mutable - dense).is_frozen()
+
+
+def test_frozen_polynomials_read_from_many_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = random.Random(45)
+    shared = [Polynomial(random_poly_list(rng, n)).freeze() for n in (8, 100)]
+    shared.append(Polynomial([(5, 3000), (-1, 7)]).freeze())
+
+    def read(p):
+        return (str(p), dict(p.poly_dict), list(p.key_list), hash(p), p.sort_key(), str(-p), str(p * p), str(p ** 3))
+
+    # reference values from private copies, before the shared caches fill
+    expected = [read(p._copy().freeze()) for p in shared]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(read, shared * 50))
+    assert results == expected * 50
+
+
+def test_memo_hits_misses_and_eviction():
+    class Memo(Polynomial):
+        pass
+
+    rng = random.Random(43)
+    a, b, c = (Memo(random_poly_list(rng, 50)).freeze() for _ in range(3))
+    memo = Memo.memoize(maxsize=2)
+    try:
+        first = a * b
+        assert first.is_frozen() and a * b is first
+        assert (a * b).poly_dict == a.mul(b).poly_dict
+        assert a + b == b + a and (a ** 3) is (a ** 3)
+        info = memo.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (3, 4, 2) and info.evictions == 2
+        mutable = Memo([(1, 1)])
+        mutable * a
+        assert memo.cache_info().misses == 4
+        Memo.memoize(maxsize=None, maxbytes=1)
+        assert a * c is not a * c and Memo._memo.cache_info().currsize == 0
+    finally:
+        Memo.memoize(0)
+    assert Memo._memo is None and Polynomial._memo is None
+
+
+def test_memo_keys_on_coefficient_types_and_counts_operands():
+    class Memo(Polynomial):
+        pass
+
+    a = Memo([(3, 2), (1, 0)]).freeze()
+    ints, floats, fracs = (Memo([(c, 0)]).freeze() for c in (1, 1.0, Fraction(1)))
+    memo = Memo.memoize(maxsize=None)
+    try:
+        assert ints == floats == fracs
+        assert [type(c) for c in (a * ints).poly_dict.values()] == [int, int]
+        assert [type(c) for c in (a * floats).poly_dict.values()] == [float, float]
+        assert [type(c) for c in (a * fracs).poly_dict.values()] == [Fraction, Fraction]
+        assert memo.cache_info().misses == 3 and memo.cache_info().currsize == 3
+        big = Memo([(c, c) for c in range(1, 2001)]).freeze()
+        Memo.memoize(maxsize=None, maxbytes=big._nbytes() + 64)
+        # the result is tiny, but the entry keeps big alive
+        assert big * Memo([]).freeze() == Memo([])
+        assert Memo._memo.cache_info().currsize == 0
+    finally:
+        Memo.memoize(0)
+
+
+# ---------- Multipoint evaluation and interpolation ----------
+
+@pytest.mark.parametrize("leaf", [None, 4])
+def test_evaluate_many_matches_pointwise(leaf):
+    rng = random.Random(31)
+
+    class Tuned(Polynomial):
+        MULTIPOINT_LEAF = leaf
+
+    f = Tuned(random_poly_list(rng, 80, bound=100))
+    xs = rng.sample(range(-1000, 1000), 100)
+    assert f.evaluate_many(xs).tolist() == [f(x) for x in xs]
+    floats = np.linspace(-1, 1, 50)
+    assert np.allclose(f.evaluate_many(floats), f.evaluate(floats))
+
+
+@pytest.mark.parametrize("leaf", [None, 4])
+def test_interpolate_round_trip(leaf):
+    from fractions import Fraction
+
+    rng = random.Random(32)
+
+    class Tuned(Polynomial):
+        MULTIPOINT_LEAF = leaf
+
+    f = Tuned(random_poly_list(rng, 40, bound=100))
+    xs = rng.sample(range(-500, 500), 41)
+    assert Tuned.interpolate(xs, f.evaluate_many(xs)) == f
+    ys = [rng.randint(-5, 5) for _ in xs[:12]]
+    g = Tuned.interpolate(xs[:12], ys)
+    assert any(type(c) is Fraction for c in g.poly_dict.values())
+    assert [g(x) for x in xs[:12]] == ys
+    assert Tuned.interpolate([Fraction(1, 2), 3], [1, Fraction(2, 3)])(Fraction(1, 2)) == 1
+    assert str(Tuned.interpolate([0, 1], [1, 2])) == "1x + 1"
+    assert str(Tuned.interpolate([2, 0, -2], [4, 0, 4])) == "1x^2"
+    with pytest.raises(ValueError):
+        Tuned.interpolate([1, 2, 1], [0, 0, 0])
+    with pytest.raises(ValueError):
+        Tuned.interpolate([1, 2], [0])
+
+
+# ---------- Modular coefficients ----------
+
+def reduced(p, modulus):
+    return {e: c % modulus for e, c in p.poly_dict.items() if c % modulus}
+
+
+@pytest.mark.parametrize("modulus", [998244353, 10**9 + 7, 2**61 - 1, 12])
+def test_mod_mul_matches_reduced_integer_product(modulus):
+    rng = random.Random(21)
+    for n in (5, 100, 700):
+        a = random_poly_list(rng, n, bound=10**20)
+        b = random_poly_list(rng, n // 2, density=0.8, bound=10**6)
+        expected = reduced(Polynomial(a) * Polynomial(b), modulus)
+        prod = ModPolynomial(a, modulus) * ModPolynomial(b, modulus)
+        assert prod.poly_dict == expected
+        assert all(0 <= c < modulus for c in prod.poly_dict.values())
+        if prod.is_dense() and modulus < 2**63:
+            assert prod.coefficients().dtype == np.int64
+
+
+def test_mod_add_sub_neg_reduce():
+    m = 7
+    p = ModPolynomial([(5, 2), (3, 0)], m)
+    q = ModPolynomial([(4, 2), (-3, 0)], m)
+    assert (p + q).poly_dict == {2: 2}
+    assert (p - p).iszero()
+    assert (-p).poly_dict == {2: 2, 0: 4}
+    assert (p + Polynomial([(2, 2)])).poly_dict == {0: 3}
+    assert (Polynomial([(2, 2), (4, 0)]) + p).poly_dict == {}
+    r = ModPolynomial([(1, 1)], m)
+    r += ModPolynomial([(6, 1)], m)
+    assert r.iszero()
+
+
+def test_mod_modulus_is_enforced():
+    p = ModPolynomial([(1, 1), (1, 0)], 5)
+    q = ModPolynomial([(1, 1), (1, 0)], 7)
+    for op in (lambda: p + q, lambda: p - q, lambda: p * q, lambda: p < q):
+        with pytest.raises(ValueError):
+            op()
+    assert p != q
+    assert p == Polynomial([(6, 1), (-4, 0)])
+    assert ModPolynomial([(4, 1)], 5) < ModPolynomial([(1, 2)], 5)
+    assert ModPolynomial([(9, 1)], 5) > ModPolynomial([(3, 1)], 5)
+    with pytest.raises(ValueError):
+        ModPolynomial([(1, 0)], 1)
+    assert not p == None and p != 1 and p not in [None, 1] and p in [None, p]
+    for op in (lambda: p < None, lambda: p > 1, lambda: p >= "x"):
+        with pytest.raises(TypeError):
+            op()
+
+
+def test_mod_division_gcd_and_evaluation():
+    m = 10**9 + 7
+    rng = random.Random(22)
+    a = ModPolynomial(random_poly_list(rng, 200), m)
+    b = ModPolynomial(random_poly_list(rng, 60), m)
+    a2 = ModPolynomial(random_poly_list(rng, 400), m)
+    b2 = ModPolynomial(random_poly_list(rng, 150), m)
+    q, r = divmod(a2, b2)  # Newton reciprocal mod p
+    assert q * b2 + r == a2 and max(r.poly_dict) < 150
+    q, r = divmod(a, b)
+    assert q * b + r == a and max(r.poly_dict, default=-1) < max(b.poly_dict)
+    g = ModPolynomial(random_poly_list(rng, 10), m)
+    d = (a * g).gcd(b * g)
+    assert d.poly_dict[max(d.poly_dict)] == 1 and len((g // d).poly_dict) == 1
+    big = ModPolynomial([(3, 10**12), (1, 1)], m)
+    assert big % ModPolynomial([(1, 5), (-2, 0)], m) == ModPolynomial([(3 * pow(2, 2 * 10**11, m), 0), (1, 1)], m)
+    assert a(12345) == Polynomial(list(zip(a.poly_dict.values(), a.poly_dict))).evaluate(12345) % m
+    assert (ModPolynomial([(3, 1)], 7) ** -1).poly_dict == {-1: 5}
+    with pytest.raises(ValueError):
+        divmod(ModPolynomial([(1, 2)], 6), ModPolynomial([(2, 1)], 6))
+
+
+def test_mod_evaluate_many_and_interpolate_on_the_tree():
+    m = 998244353
+    rng = random.Random(23)
+
+    class Tuned(ModPolynomial):
+        MULTIPOINT_LEAF = 8
+
+    f = Tuned(random_poly_list(rng, 300), m)
+    xs = rng.sample(range(m), 301)
+    values = f.evaluate_many(xs)
+    assert values.dtype == np.int64
+    assert values.tolist() == [f(x) for x in xs]
+    assert Tuned.interpolate(xs, values, m) == f
+    xs[0] = 0
+    assert Tuned.interpolate(xs, [f(x) for x in xs], m) == f
+    assert ModPolynomial.interpolate([0, 1], [1, 2], 7) == ModPolynomial([(1, 1), (1, 0)], 7)
+    with pytest.raises(ValueError):
+        Tuned.interpolate([1, m + 1], [0, 0], m)
+
+
+# ---------- Polynomial arrays ----------
+def array_cases(rng):
+    dense = [Polynomial(random_poly_list(rng, rng.randint(0, 6))) for _ in range(40)]
+    sparse = [Polynomial([(rng.randint(-5, 5), rng.randint(0, 10**6)) for _ in range(3)]) for _ in range(40)]
+    return dense, sparse
+
+
+@pytest.mark.parametrize("left, right", [(0, 0), (1, 1), (0, 1)])
+def test_polynomial_array_arithmetic_matches_rows(left, right):
+    rng = random.Random(31)
+    A = array_cases(rng)[left]
+    B = array_cases(rng)[right]
+    B[0], B[1] = Polynomial(), A[1]
+    PA, PB = PolynomialArray.from_polynomials(A), PolynomialArray.from_polynomials(B)
+    assert PA.is_dense() == (left == 0)
+    assert (PA + PB).to_polynomials() == [a + b for a, b in zip(A, B)]
+    assert (PA - PB).to_polynomials() == [a - b for a, b in zip(A, B)]
+    assert (PA * PB).to_polynomials() == [a * b for a, b in zip(A, B)]
+    assert (-PA).to_polynomials() == [-a for a in A]
+    assert (PA * B[2]).to_polynomials() == [a * B[2] for a in A]
+
+
+def test_polynomial_array_promotes_past_int64():
+    big = Polynomial([(2**62, 0), (3, 1)])
+    P = PolynomialArray.from_polynomials([big, big])
+    assert (P + P).to_polynomials() == [big + big] * 2
+    assert (P * P).to_polynomials() == [big * big] * 2
+    assert P.evaluate(10**10).tolist() == [big(10**10)] * 2
+
+
+def test_polynomial_array_evaluate_and_compare():
+    rng = random.Random(37)
+    for A in array_cases(rng):
+        B = [Polynomial(random_poly_list(rng, 3)) if i % 3 else a for i, a in enumerate(A)]
+        PA, PB = PolynomialArray.from_polynomials(A), PolynomialArray.from_polynomials(B)
+        xs = [rng.randint(-2, 2) for _ in A]
+        assert PA.evaluate(xs).tolist() == [a(x) for a, x in zip(A, xs)]
+        assert np.allclose(PA(0.5).astype(float), [float(a(0.5)) for a in A])
+        assert (PA == PB).tolist() == [a == b for a, b in zip(A, B)]
+        assert (PA < PB).tolist() == [a < b for a, b in zip(A, B)]
+        assert (PA >= PB).tolist() == [a >= b for a, b in zip(A, B)]
+
+
+def test_polynomial_array_indexing_and_layout():
+    rows = np.array([[1, 2, 0], [0, 0, 0], [5, 0, 7]])
+    P = PolynomialArray(rows)
+    assert len(P) == 3 and P.is_dense()
+    assert P[2] == Polynomial([(5, 0), (7, 2)])
+    assert P[[2, 2, 0]].to_polynomials() == [P[2], P[2], P[0]]
+    assert np.array_equal(P.coefficients(), rows)
+    with pytest.raises(ValueError):
+        P + PolynomialArray(rows[:2])
+
+
+def test_polynomial_array_dense_indexing_reads_rows(monkeypatch):
+    rng = random.Random(26)
+    A = array_cases(rng)[0]
+    P = PolynomialArray.from_polynomials(A)
+    assert P.is_dense()
+    monkeypatch.setattr(PolynomialArray, "_csr", None)  # dense rows never need it
+    assert [P[i] for i in range(-len(A), len(A))] == A + A
+    assert P[5:30:3].is_dense() and P[5:30:3].coefficients().tolist() == P.coefficients()[5:30:3].tolist()
+    mask = np.arange(len(A)) % 4 == 1
+    assert P[mask].coefficients().tolist() == P.coefficients()[mask].tolist()
+    first = P[0]
+    first += Polynomial([(1, 0)])
+    assert P[0] == A[0]
+    with pytest.raises(IndexError):
+        P[len(A)]
+
+
+# ---------- Text format ----------
+def test_parse_round_trips_str():
+    rng = random.Random(41)
+    for _ in range(300):
+        terms = [
+            (rng.choice([rng.randint(-(10**30), 10**30), rng.randint(-2, 2), Fraction(rng.randint(-9, 9), rng.randint(1, 9)), rng.uniform(-5, 5)]), rng.randint(-5, 20))
+            for _ in range(rng.randint(0, 8))
+        ]
+        p = Polynomial(terms)
+        assert Polynomial.parse(str(p)) == p
+    m = ModPolynomial(random_poly_list(rng, 50), 998244353)
+    assert ModPolynomial.parse(str(m), 998244353) == m
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("x^2 + x", {2: 1, 1: 1}),
+        ("-x", {1: -1}),
+        ("  ", {}),
+        ("0", {}),
+        ("1 + 2x + x", {0: 1, 1: 3}),
+        ("3x^2-2x^-1", {2: 3, -1: -2}),
+        ("1e-05x^3", {3: 1e-05}),
+    ],
+)
+def test_parse_accepts_hand_written_forms(text, expected):
+    assert Polynomial.parse(text).poly_dict == expected
+
+
+@pytest.mark.parametrize("text", ["3x 2", "x^", "3x +", "+", "2y", "3x^2.5", "--x", "1/x"])
+def test_parse_rejects_malformed_text(text):
+    with pytest.raises(ValueError):
+        Polynomial.parse(text)
+
+
+def test_write_to_and_parse_many_stream_a_file():
+    rng = random.Random(43)
+    polys = [Polynomial(random_poly_list(rng, rng.randint(0, 6))) for _ in range(200)]
+    polys.append(Polynomial(random_poly_list(rng, 20000)))
+    stream = io.StringIO()
+    for p in polys:
+        p.write_to(stream)
+    assert stream.getvalue() == "".join(f"{p}\n" for p in polys)
+    stream.seek(0)
+    assert list(Polynomial.parse_many(stream)) == polys
+
+
+# ---------- Binary format ----------
+def binary_cases(rng):
+    return [
+        Polynomial(),
+        Polynomial(random_poly_list(rng, 300)),
+        Polynomial(random_poly_list(rng, 50, bound=10**40)),
+        Polynomial([(5, 10**12), (-1, -3), (2**70, 4)]),
+        Polynomial([(1.5, 2), (-0.25, 0)]),
+    ]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    rng = random.Random(47)
+    for p in binary_cases(rng):
+        p.save(tmp_path / "p.bin")
+        q = Polynomial.load(tmp_path / "p.bin")
+        assert q == p and q.is_frozen()
+    m = ModPolynomial(random_poly_list(rng, 100), 998244353)
+    m.save(tmp_path / "m.bin")
+    assert ModPolynomial.load(tmp_path / "m.bin", 998244353) == m
+    with pytest.raises(TypeError):
+        Polynomial([(Fraction(1, 2), 1)]).save(tmp_path / "f.bin")
+
+
+def test_load_maps_dense_coefficients_without_copying(tmp_path):
+    p = Polynomial.from_coefficients(np.arange(1, 100001))
+    p.save(tmp_path / "p.bin")
+    q = Polynomial.load(tmp_path / "p.bin")
+    assert q.is_dense() and q._dense.base is not None
+    assert not q._dense.flags.writeable
+    assert q(2) == p(2) and q + q == p + p
+
+
+def test_archive_appends_and_indexes(tmp_path):
+    rng = random.Random(53)
+    polys = binary_cases(rng)
+    archive = PolynomialArchive(tmp_path / "a.bin")
+    archive.extend(polys[:3])
+    assert archive[1] == polys[1]
+    archive.append(polys[3])
+    archive.append(polys[4])
+    reopened = PolynomialArchive(tmp_path / "a.bin")
+    assert len(reopened) == 5
+    assert list(reopened) == polys
+    assert reopened[-2] == polys[3] and reopened[1:3] == polys[1:3]
+    Polynomial([(1, 0)]).save(tmp_path / "p.bin")
+    with pytest.raises(ValueError):
+        PolynomialArchive(tmp_path / "p.bin")
+
+
+def test_archive_extend_failure_leaves_it_unchanged(tmp_path):
+    path = tmp_path / "a.bin"
+    archive = PolynomialArchive(path)
+    archive.extend([Polynomial([(1, 0), (2, 3)])])
+    before = path.read_bytes()
+    bad = [Polynomial([(5, 1)]), Polynomial([(Fraction(1, 2), 0)])]
+    with pytest.raises(TypeError):
+        archive.extend(bad)
+    assert path.read_bytes() == before and len(archive) == 1
+    archive.append(Polynomial([(7, 2)]))
+    assert list(PolynomialArchive(path)) == [Polynomial([(1, 0), (2, 3)]), Polynomial([(7, 2)])]
+
+
+# ---------- Degree and sort keys ----------
+def test_sort_key_orders_like_lt():
+    rng = random.Random(59)
+    polys = [Polynomial([(rng.randint(-2, 2), rng.randint(0, 4)) for _ in range(rng.randint(0, 4))]) for _ in range(400)]
+    polys += [Polynomial.from_coefficients([rng.randint(-1, 1) for _ in range(40)]) for _ in range(40)]
+    for _ in range(3000):
+        a, b = rng.choice(polys), rng.choice(polys)
+        assert (a < b) == (a.sort_key() < b.sort_key())
+        assert (a == b) == (a.sort_key() == b.sort_key())
+    assert [p.sort_key() for p in sorted(polys)] == sorted(p.sort_key() for p in polys)
+
+
+def test_ordering_with_foreign_operands():
+    p = Polynomial([(1, 0), (2, 1)])
+    for op in (operator.lt, operator.le, operator.gt, operator.ge):
+        with pytest.raises(TypeError):
+            op(p, None)
+        with pytest.raises(TypeError):
+            op(None, p)
+    rows = PolynomialArray.from_polynomials([Polynomial([(1, 0)]), p, Polynomial([(1, 3)])])
+    assert (p < rows).tolist() == [False, False, True]
+    assert (p >= rows).tolist() == [True, True, False]
+
+
+def test_degree_and_leading_coefficient():
+    assert Polynomial().degree() is None and Polynomial().leading_coefficient() == 0
+    assert Polynomial([(3, -2), (-7, 5)]).degree() == 5
+    dense = Polynomial.from_coefficients(np.arange(1, 101))
+    assert dense.degree() == 99 and dense.leading_coefficient() == 100
+
+
+def test_sort_key_follows_in_place_changes():
+    p = Polynomial([(1, 2)])
+    key = p.sort_key()
+    p += Polynomial([(1, 3)])
+    assert p.sort_key() != key and p.sort_key() == (3, 1, 2, 1)
+    p *= Polynomial([(2, 1)])
+    assert p.sort_key() == (4, 2, 3, 2)
+    p.poly_dict[10] = 1
+    p._normalize()
+    assert p.degree() == 10 and p.sort_key()[:2] == (10, 1)
+    p.poly_dict = {0: 5}
+    assert p.sort_key() == (0, 5)
+
+
+# ---------- Multivariate polynomials ----------
+def random_multi(rng, nvars, nterms, degree=4):
+    return MultiPolynomial([(rng.randint(-5, 5), tuple(rng.randint(0, degree) for _ in range(nvars))) for _ in range(nterms)], nvars)
+
+
+def multi_product_reference(a, b):
+    d = {}
+    for va, ca in a.items():
+        for vb, cb in b.items():
+            v = tuple(x + y for x, y in zip(va, vb))
+            d[v] = d.get(v, 0) + ca * cb
+    return {v: c for v, c in d.items() if c != 0}
+
+
+@pytest.mark.parametrize("nvars", [1, 3, 10])
+def test_multi_arithmetic_matches_dict_reference(nvars):
+    rng = random.Random(61 + nvars)
+    for _ in range(40):
+        a, b = random_multi(rng, nvars, rng.randint(0, 8)), random_multi(rng, nvars, rng.randint(0, 8))
+        assert (a * b).poly_dict == multi_product_reference(a.poly_dict, b.poly_dict)
+        assert (a - b + b) == a and (a - a).iszero()
+        point = [rng.randint(-3, 3) for _ in range(nvars)]
+        assert (a * b)(*point) == a(*point) * b(*point)
+
+
+def test_multi_widens_fields_for_large_exponents():
+    a = MultiPolynomial([(1, (10**6, 0, 3))])
+    b = MultiPolynomial([(2, (1, 2, 3)), (1, (0, 0, 0))])
+    assert (a * b).poly_dict == {(10**6 + 1, 2, 6): 2, (10**6, 0, 3): 1}
+    assert b**3 == b * b * b
+    assert MultiPolynomial([(1, (40, 0, 0))]) ** 2 == MultiPolynomial([(1, (80, 0, 0))])
+
+
+def test_multi_order_printing_and_conversion():
+    rng = random.Random(67)
+    polys = [random_multi(rng, 3, rng.randint(0, 4), degree=2) for _ in range(200)]
+    for _ in range(500):
+        a, b = rng.choice(polys), rng.choice(polys)
+        assert (a < b) == (a.sort_key() < b.sort_key())
+    assert str(MultiPolynomial([(3, (2, 1, 0)), (-2, (0, 0, 1)), (1, (0, 0, 0))])) == "3x1^2x2 - 2x3 + 1"
+    p = Polynomial([(3, 5), (-2, 1), (1, 0)])
+    m = MultiPolynomial.from_polynomial(p, nvars=3, var=1)
+    assert str(m) == "3x2^5 - 2x2 + 1" and m.to_polynomial(1) == p
+    with pytest.raises(ValueError):
+        (m * MultiPolynomial([(1, (1, 0, 0))])).to_polynomial(1)
+
+
+def test_multi_follows_the_operator_protocol():
+    m = MultiPolynomial([(2, (1, 0)), (1, (0, 0))])
+    p = Polynomial([(3, 2), (1, 0)])  # a polynomial in x1
+    as_multi = MultiPolynomial.from_polynomial(p, nvars=2)
+    assert p + m == m + p == as_multi + m
+    assert p - m == as_multi - m and p * m == m * p == as_multi * m
+    assert m != None and m != "x" and None not in [m] and m in [None, m]
+    for bad in (lambda: m + "x", lambda: "x" * m, lambda: m ** 0.5, lambda: m < None):
+        with pytest.raises(TypeError):
+            bad()
+    with pytest.raises(ValueError):
+        m ** -1
+
+
+# ---------- Composition ----------
+def terms_of(p):
+    return [(c, e) for e, c in p.poly_dict.items()]
+
+
+def horner_compose(p, q):
+    acc = Polynomial()
+    for c in reversed(p.coefficients().tolist() if not p.iszero() else []):
+        acc = acc * q + Polynomial([(c, 0)])
+    return acc
+
+
+@pytest.mark.parametrize("qdeg", [0, 1, 2, 5])
+def test_compose_matches_horner_on_polynomials(qdeg):
+    rng = random.Random(73 + qdeg)
+
+    class Blocks(Polynomial):
+        COMPOSE_LEAF = 4
+
+    for _ in range(15):
+        p = Polynomial(random_poly_list(rng, rng.randint(0, 70), bound=50))
+        q = Polynomial(random_poly_list(rng, qdeg, bound=9))
+        expected = horner_compose(p, q)
+        assert p.compose(q) == expected
+        assert Blocks(terms_of(p)).compose(Blocks(terms_of(q))) == expected
+
+
+def test_compose_sparse_and_taylor_shift():
+    q = Polynomial([(1, 2), (1, 0)])
+    p = Polynomial([(3, 1000), (-1, 3), (2, 0)])
+    assert p.compose(q) == Polynomial([(3, 0)]) * q**1000 - q**3 + Polynomial([(2, 0)])
+    assert Polynomial([(1, 2)]).taylor_shift(Fraction(1, 2)) == Polynomial([(1, 2), (1, 1), (Fraction(1, 4), 0)])
+    rng = random.Random(79)
+    p = Polynomial(random_poly_list(rng, 200, bound=9))
+    for a in (1, -3, 10**20):
+        assert p.taylor_shift(a) == horner_compose(p, Polynomial([(1, 1), (a, 0)]))
+    with pytest.raises(ValueError):
+        Polynomial([(1, -1)]).taylor_shift(1)
+
+
+def test_mod_compose_and_shift_on_blocks():
+    m = 998244353
+    rng = random.Random(83)
+    p, q = Polynomial(random_poly_list(rng, 300, bound=m)), Polynomial(random_poly_list(rng, 3, bound=m))
+    mp, mq = ModPolynomial(terms_of(p), m), ModPolynomial(terms_of(q), m)
+    assert mp.compose(mq).poly_dict == reduced(p.compose(q), m)
+    assert mp.taylor_shift(5).poly_dict == reduced(p.taylor_shift(5), m)
+
+
+# ---------- Calculus and truncated series ----------
+def calculus_cases(rng):
+    return [
+        Polynomial(),
+        Polynomial(random_poly_list(rng, 200, bound=9)),
+        Polynomial([(rng.randint(-9, 9), rng.randint(-20, 10**6)) for _ in range(50)]),
+        Polynomial(random_poly_list(rng, 100, bound=2**80)),
+        Polynomial([(1.5, 3), (2.0, 0)]),
+    ]
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 25])
+def test_derivative_matches_termwise_rule(k):
+    rng = random.Random(89)
+    for p in calculus_cases(rng):
+        expected = {}
+        for e, c in p.poly_dict.items():
+            f = c
+            for j in range(k):
+                f *= e - j
+            if f:
+                expected[e - k] = f
+        assert p.derivative(k).poly_dict == expected
+
+
+def test_integral_is_exact_and_inverts_derivative():
+    rng = random.Random(97)
+    for p in calculus_cases(rng)[:2] + calculus_cases(rng)[3:]:
+        integral = p.integral()
+        assert integral.derivative() == p
+        assert 0 not in integral.poly_dict
+    assert Polynomial([(1, 2), (4, 1)]).integral().poly_dict == {3: Fraction(1, 3), 2: 2}
+    with pytest.raises(ValueError):
+        Polynomial([(1, -1)]).integral()
+    m = ModPolynomial(random_poly_list(rng, 50, bound=10**9), 998244353)
+    assert m.integral().derivative() == m
+
+
+def test_truncate_and_mul_trunc_match_full_product():
+    rng = random.Random(101)
+    cases = [p for p in calculus_cases(rng) if all(e >= 0 for e in p.poly_dict)]
+    cases.append(Polynomial(random_poly_list(rng, 3000, bound=9)))
+    for p in cases:
+        for q in cases:
+            for n in (0, 1, 7, 150, 10**7):
+                assert p.mul_trunc(q, n) == (p * q).truncate(n)
+    for n in (0, 5, 10**7):
+        assert cases[2].truncate(n).poly_dict == {e: c for e, c in cases[2].poly_dict.items() if e < n}
+    m = ModPolynomial(random_poly_list(rng, 300, bound=10**9), 998244353)
+    assert m.mul_trunc(m, 100) == (m * m).truncate(100)
+
+
+# ---------- Instrumentation ----------
+
+def test_profiler_counts_calls_allocations_and_sorts():
+    a = Polynomial.from_coefficients(range(1, 100))
+    b = Polynomial([(1, 3), (2, 7), (5, 10**6)])
+    original = Polynomial.__add__
+    with PolynomialProfiler() as prof:
+        assert Polynomial.__add__ is not original
+        c = a * b + a
+        Polynomial([(1, 2), (1, 2), (3, 0)])
+        str(c)
+    assert Polynomial.__add__ is original and not prof.enabled
+    stats = prof.stats()
+    assert stats["__mul__"]["calls"] == 1 and stats["__add__"]["calls"] == 1
+    assert stats["__mul__"]["terms"] == {2: 1, 7: 1}  # 3 and 99 terms
+    assert stats["__str__"]["calls"] == 1 and stats["__mul__"]["seconds"] > 0
+    assert prof.allocations >= 3 and prof.sorts >= 1
+    a * b
+    assert prof.stats()["__mul__"]["calls"] == 1
+
+
+def test_profiler_callbacks_and_overrides_counted_once():
+    events = []
+    prof = PolynomialProfiler(ops=["__init__", "__mul__"])
+    prof.add_callback(events.append)
+    prof.enable()
+    try:
+        m = ModPolynomial([(3, 1)], 7) * ModPolynomial([(5, 2), (1, 0)], 7)
+    finally:
+        prof.disable()
+    assert m.poly_dict == {3: 1, 1: 3}
+    assert [e.op for e in events] == ["__init__", "__init__", "__mul__"]
+    assert events[-1].terms == (1, 2) and events[-1].seconds >= 0
+    assert prof.calls == {"__init__": 2, "__mul__": 1}
+
+
+def test_profiler_counts_calls_from_every_thread():
+    import threading
+
+    a = Polynomial(random_poly_list(random.Random(61), 200))
+    start = threading.Barrier(4)
+
+    def work():
+        start.wait()
+        for _ in range(40):
+            a * a
+
+    with PolynomialProfiler(ops=["__mul__"]) as prof:
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert prof.calls == {"__mul__": 160}
+    assert sum(prof.stats()["__mul__"]["terms"].values()) == 320
+
+
+def test_profiler_report_and_reset():
+    stream = io.StringIO()
+    p = Polynomial([(2, 5), (1, 0)])
+    with PolynomialProfiler() as prof:
+        sorted([p * p, p, -p])
+    prof.dump(stream)
+    text = stream.getvalue()
+    assert "__mul__" in text and "__lt__" in text and "allocations" in text
+    prof.reset()
+    assert prof.stats() == {} and prof.allocations == prof.sorts == 0
+    with pytest.raises(RuntimeError):
+        with prof:
+            prof.enable()
+    assert not hasattr(Polynomial.__mul__, "__wrapped__") and not prof.enabled
+
+
+# ---------- Lazy expressions ----------
+
+def lazy_cases(rng):
+    return [
+        Polynomial(random_poly_list(rng, 300)),
+        Polynomial(random_poly_list(rng, 200, density=0.8, bound=2**70)),
+        Polynomial([(rng.randint(-9, 9), rng.randint(-50, 10**6)) for _ in range(40)]),
+        Polynomial([(3, 2), (-1, 0)]),
+    ]
+
+
+def test_lazy_expressions_match_eager_arithmetic():
+    rng = random.Random(110)
+    a, b, c, d = lazy_cases(rng)
+    la, lb, lc, ld = (p.lazy() for p in (a, b, c, d))
+    assert la * lb + lc * ld - d == a * b + c * d - d
+    assert (la + lc) * (lb - ld) * la == (a + c) * (b - d) * a
+    assert -(ld**3) + c - lb * a == -(d**3) + c - b * a
+    assert (la * lb) * (la * lb) + la * lb - (lc + ld) * (lc + ld) == (a * b) * (a * b) + a * b - (c + d) * (c + d)
+    s = la
+    for _ in range(3000):
+        s = s - ld
+    assert s == a - d * Polynomial([(3000, 0)])
+    assert isinstance(la + b, LazyPolynomial) and isinstance(b * la, LazyPolynomial)
+
+
+def test_lazy_sums_take_products_straight_from_the_kernels(monkeypatch):
+    rng = random.Random(111)
+    a, b, c, d = lazy_cases(rng)
+    expected = a * b - c * d + c * b
+    la, lb, lc, ld = (p.lazy() for p in (a, b, c, d))
+
+    def no_mul(*args, **kwargs):
+        raise AssertionError("fused products must not be materialized")
+
+    monkeypatch.setattr(Polynomial, "mul", no_mul)
+    assert (la * lb - lc * ld + lc * lb).force() == expected
+
+
+def test_lazy_shares_common_subexpressions():
+    rng = random.Random(112)
+    a, b, c, d = lazy_cases(rng)
+    la, lb, lc, ld = (p.lazy() for p in (a, b, c, d))
+    expr = (la * lb) * lc + (b.lazy() * a.lazy()) * ld
+    with PolynomialProfiler(ops=["mul"]) as prof:
+        value = expr.force()
+    assert prof.calls == {"mul": 1}
+    assert value == a * b * c + a * b * d
+    assert expr.force() is value
+
+
+def test_lazy_forcing_and_coefficient_rings():
+    p, q = Polynomial([(1, 1), (2, 0)]), Polynomial([(1, 1), (-2, 0)])
+    expr = p.lazy() * q.lazy() + p
+    p += Polynomial([(1, 2)])  # leaves are not copied
+    assert str(expr) == "1x^3 + 1x - 2"
+    assert expr == Polynomial([(1, 3), (1, 1), (-2, 0)]).lazy()
+    assert expr.evaluate(2) == expr(2) == 8
+    m = ModPolynomial([(3, 2), (4, 1)], 7)
+    assert m.lazy() * m + m == m * m + m
+    assert (m.lazy() * Polynomial([(10, 1)]) + m).force() == m * Polynomial([(10, 1)]) + m
+    with pytest.raises(ValueError):
+        (m.lazy() + ModPolynomial([(1, 0)], 5)).force()
+
+
+# ---------- Roots ----------
+
+def known_root_poly(rng):
+    """Polynomial with known distinct real roots (some repeated) and a complex pair."""
+    ints = rng.sample(range(-40, 40), rng.randint(0, 4))
+    squares = rng.sample([2, 3, 5, 7, 11, 1000003], rng.randint(0, 2))
+    p = Polynomial([(rng.randint(1, 5), 0)])
+    for r in ints:
+        p = p * Polynomial([(1, 1), (-r, 0)]) ** rng.randint(1, 2)
+    for m in squares:
+        p = p * Polynomial([(1, 2), (-m, 0)])
+    p = p * Polynomial([(1, 2), (rng.randint(1, 9), 0)])
+    roots = sorted([Fraction(r) for r in ints] + [s * m**0.5 for m in squares for s in (-1, 1)])
+    return p, roots
+
+
+def check_intervals(intervals, roots):
+    assert len(intervals) == len(roots)
+    for (lo, hi), r in zip(intervals, roots):
+        assert lo == hi == r if lo == hi else lo < r < hi
+    for (_, hi), (lo, _) in zip(intervals, intervals[1:]):
+        assert hi <= lo
+
+
+def test_roots_match_numpy():
+    rng = random.Random(120)
+    for _ in range(20):
+        p = Polynomial(random_poly_list(rng, rng.randint(1, 12), bound=50))
+        expected = np.sort(np.roots(p.coefficients()[::-1]))
+        assert np.allclose(p.roots(), expected)
+    assert np.allclose(Polynomial([(1, 5), (-4, 3)]).roots(), [-2, 0, 0, 0, 2])
+    assert len(Polynomial([(7, 0)]).roots()) == 0 and len(Polynomial().roots()) == 0
+    with pytest.raises(TypeError):
+        ModPolynomial([(1, 2), (1, 0)], 7).roots()
+
+
+def test_real_root_intervals_isolate_distinct_roots():
+    rng = random.Random(121)
+    for _ in range(30):
+        p, roots = known_root_poly(rng)
+        check_intervals(p.real_root_intervals(), roots)
+    p = Polynomial([(1, 4), (-2, 2)]) * Polynomial([(1, 1), (-3, 0)]) ** 2  # x^2 (x^2 - 2) (x - 3)^2
+    check_intervals(p.real_root_intervals(), [-(2**0.5), 0, 2**0.5, 3])
+    half = Polynomial([(Fraction(1, 2), 2), (Fraction(-1, 8), 0)])
+    check_intervals(half.real_root_intervals(), [Fraction(-1, 2), Fraction(1, 2)])
+    assert Polynomial([(1, 2), (1, 0)]).real_root_intervals() == []
+    with pytest.raises(ValueError):
+        Polynomial().real_root_intervals()
+    with pytest.raises(TypeError):
+        Polynomial([(0.5, 1), (1, 0)]).real_root_intervals()
+
+
+def test_real_root_intervals_with_roots_on_bisection_points():
+    rng = random.Random(123)
+    grid = [Fraction(k, 4) for k in range(-40, 41, 2)] + [Fraction(k) for k in (-64, -16, 16, 64)]
+    cases = []
+    for _ in range(120):
+        roots = sorted(rng.sample(grid, rng.randint(1, 7)))
+        p = Polynomial([(rng.choice((-3, 1, 2)), 0)])
+        for r in roots:
+            p = p * Polynomial([(r.denominator, 1), (-r.numerator, 0)])
+        cases.append((p, roots))
+    p = Polynomial([(1, 1), (1, 0)]) * Polynomial([(1, 1), (-1, 0)]) * Polynomial([(2, 2), (-1, 0)])
+    cases.append((p, [-1, -(0.5**0.5), 0.5**0.5, 1]))
+    p = Polynomial([(1, 1), (8, 0)]) * Polynomial([(1, 1), (4, 0)]) * Polynomial([(1, 2), (-30, 0)])
+    cases.append((p, [-8, -(30**0.5), -4, 30**0.5]))
+    for p, roots in cases:
+        check_intervals(p.real_root_intervals(), roots)
+    batch = PolynomialArray.from_polynomials([p for p, _ in cases]).real_root_intervals()
+    assert batch == [p.real_root_intervals() for p, _ in cases]
+
+
+def test_polynomial_array_roots_in_one_batch():
+    rng = random.Random(122)
+    cases = [known_root_poly(rng) for _ in range(200)]
+    polys = [p for p, _ in cases] + [Polynomial([(3, 0)]), Polynomial([(1, 40), (-1, 0)])]
+    arr = PolynomialArray.from_polynomials(polys)
+    batch = arr.real_root_intervals()
+    for intervals, (p, roots) in zip(batch, cases):
+        check_intervals(intervals, roots)
+    assert batch[-2] == [] and batch[-1] == [(-4, 0), (0, 4)]
+    values = arr.roots()
+    assert values.shape == (len(polys), 40)
+    for row, p in zip(values, polys):
+        d = p.degree()
+        assert np.allclose(row[:d], p.roots()) and np.isnan(row[d:]).all()